@@ -0,0 +1,265 @@
+# lib/admission.py
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable
+
+from sqlalchemy import case
+from sqlalchemy.exc import IntegrityError
+
+from lib.db import SessionLocal, RateLimitBucket, AdmissionCounter
+
+# -------------------------------
+# Limits (override via environment)
+# -------------------------------
+MAX_UPLOAD_MB = float(os.getenv("MAX_UPLOAD_MB", "5"))
+MAX_UPLOAD_BYTES = int(MAX_UPLOAD_MB * 1024 * 1024)
+
+# token bucket: burst of APPLY_BURST submissions, refilled at APPLY_PER_HOUR
+APPLY_BURST = float(os.getenv("APPLY_BURST", "5"))
+APPLY_PER_HOUR = float(os.getenv("APPLY_PER_HOUR", "20"))
+
+# simultaneous resume extractions per process; overflow waits in a bounded queue
+MAX_CONCURRENT_EXTRACTIONS = int(os.getenv("MAX_CONCURRENT_EXTRACTIONS", "4"))
+MAX_QUEUED_EXTRACTIONS = int(os.getenv("MAX_QUEUED_EXTRACTIONS", "16"))
+QUEUE_TIMEOUT_S = float(os.getenv("EXTRACTION_QUEUE_TIMEOUT", "30"))
+
+COUNTER_NAMES = ("accepted", "queued", "rejected_size", "rejected_rate", "rejected_busy")
+
+# counter increments are buffered per process and written in one transaction at
+# most this often (and on get_counters()/exit); 0 writes every increment through
+COUNTER_FLUSH_S = float(os.getenv("COUNTER_FLUSH_S", "5"))
+
+
+class AdmissionRejected(Exception):
+    """Raised when a submission is refused; `reason` is one of the rejected_* counters."""
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+# -------------------------------
+# Counters
+# -------------------------------
+_pending: Dict[str, int] = {}
+_pending_lock = threading.Lock()
+_flush_timer = None
+
+
+def _write_counts(counts: Dict[str, int]):
+    while True:
+        with SessionLocal() as db:
+            for name, by in sorted(counts.items()):
+                n = (
+                    db.query(AdmissionCounter)
+                    .filter(AdmissionCounter.name == name)
+                    .update({AdmissionCounter.count: AdmissionCounter.count + by})
+                )
+                if n == 0:
+                    db.add(AdmissionCounter(name=name, count=by))
+            try:
+                db.commit()
+                return
+            except IntegrityError:
+                # another session inserted a row first; it is an update next time
+                db.rollback()
+
+
+def flush_counters():
+    """Write this process's buffered increments to the database."""
+    global _pending, _flush_timer
+    with _pending_lock:
+        counts, _pending = _pending, {}
+        if _flush_timer is not None:
+            _flush_timer.cancel()
+            _flush_timer = None
+    if not counts:
+        return
+    try:
+        _write_counts(counts)
+    except Exception:
+        with _pending_lock:
+            for name, by in counts.items():
+                _pending[name] = _pending.get(name, 0) + by
+        raise
+
+
+atexit.register(flush_counters)
+
+
+def incr(name: str, by: int = 1):
+    global _flush_timer
+    if COUNTER_FLUSH_S <= 0:
+        _write_counts({name: by})
+        return
+    with _pending_lock:
+        _pending[name] = _pending.get(name, 0) + by
+        if _flush_timer is None:
+            _flush_timer = threading.Timer(COUNTER_FLUSH_S, flush_counters)
+            _flush_timer.daemon = True
+            _flush_timer.start()
+
+
+def get_counters() -> Dict[str, int]:
+    """Totals across all replicas (others' increments may lag by COUNTER_FLUSH_S)."""
+    flush_counters()
+    with SessionLocal() as db:
+        rows = dict(db.query(AdmissionCounter.name, AdmissionCounter.count))
+    return {name: rows.get(name, 0) for name in COUNTER_NAMES}
+
+
+# -------------------------------
+# Upload size
+# -------------------------------
+def check_upload_size(size_bytes: int):
+    if size_bytes > MAX_UPLOAD_BYTES:
+        incr("rejected_size")
+        raise AdmissionRejected(
+            "rejected_size", f"Resume is too large (max {MAX_UPLOAD_MB:g} MB)."
+        )
+
+
+# -------------------------------
+# Token-bucket rate limit
+# -------------------------------
+def _ensure_buckets(keys, now: float):
+    """Create missing buckets full; a concurrent creator winning the race is fine."""
+    with SessionLocal() as db:
+        have = {k for (k,) in db.query(RateLimitBucket.key).filter(RateLimitBucket.key.in_(keys))}
+    for k in keys:
+        if k in have:
+            continue
+        with SessionLocal() as db:
+            db.add(RateLimitBucket(key=k, tokens=APPLY_BURST, updated_at=now))
+            try:
+                db.commit()
+            except IntegrityError:
+                db.rollback()
+
+
+def _level(now: float):
+    """SQL expression for a bucket's refilled token count at `now`."""
+    B = RateLimitBucket
+    elapsed = case((B.updated_at < now, now - B.updated_at), else_=0.0)
+    level = B.tokens + elapsed * (max(APPLY_PER_HOUR, 0.0) / 3600.0)
+    return case((level > APPLY_BURST, APPLY_BURST), else_=level)
+
+
+def take_token(keys: Iterable[str]):
+    """
+    Spend one token from every bucket in `keys` (e.g. email + session), or
+    none of them if any bucket is empty.
+
+    Refill and spend happen in a single conditional UPDATE per bucket, so
+    concurrent requests (threads or replicas) cannot overspend a bucket.
+    """
+    keys = sorted(set(keys))
+    now = time.time()
+
+    B = RateLimitBucket
+    while True:
+        _ensure_buckets(keys, now)
+        with SessionLocal() as db:
+            level = _level(now)
+            for k in keys:
+                n = (
+                    db.query(B)
+                    .filter(B.key == k, level >= 1.0)
+                    .update(
+                        {B.tokens: level - 1.0, B.updated_at: case((B.updated_at > now, B.updated_at), else_=now)},
+                        synchronize_session=False,
+                    )
+                )
+                if n == 0:
+                    db.rollback()  # undo tokens already spent from the other buckets
+                    break
+            else:
+                db.commit()
+                return
+
+            levels = db.query(level).filter(B.key.in_(keys)).all()
+        if len(levels) == len(keys):
+            break
+        # prune_buckets() removed an idle bucket after _ensure_buckets(); recreate it
+    tokens = min(levels)[0]
+
+    incr("rejected_rate")
+    if APPLY_PER_HOUR <= 0:
+        raise AdmissionRejected("rejected_rate", "Too many submissions. Please try again later.")
+    wait_s = max(0.0, 1.0 - tokens) * 3600.0 / APPLY_PER_HOUR
+    raise AdmissionRejected(
+        "rejected_rate",
+        f"Too many submissions. Please try again in {int(wait_s // 60) + 1} min.",
+    )
+
+
+def refund_token(keys: Iterable[str]):
+    """Give back a token spent by take_token() when the server, not the applicant, failed."""
+    B = RateLimitBucket
+    with SessionLocal() as db:
+        db.query(B).filter(B.key.in_(set(keys))).update(
+            {B.tokens: case((B.tokens + 1.0 > APPLY_BURST, APPLY_BURST), else_=B.tokens + 1.0)},
+            synchronize_session=False,
+        )
+        db.commit()
+
+
+def prune_buckets(now: float = None) -> int:
+    """
+    Delete buckets idle for longer than a full refill (they are back at
+    APPLY_BURST, which is what a recreated bucket starts with), so the table
+    doesn't grow with every email/session ever seen. Returns rows deleted.
+    """
+    if APPLY_PER_HOUR <= 0:
+        return 0  # buckets never refill, so none is safe to drop
+    now = time.time() if now is None else now
+    refill_s = APPLY_BURST * 3600.0 / APPLY_PER_HOUR
+    with SessionLocal() as db:
+        n = (
+            db.query(RateLimitBucket)
+            .filter(RateLimitBucket.updated_at < now - refill_s)
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+    return n
+
+
+# -------------------------------
+# Extraction concurrency cap
+# -------------------------------
+_slots = threading.BoundedSemaphore(MAX_CONCURRENT_EXTRACTIONS)
+_waiting_lock = threading.Lock()
+_waiting = 0
+
+
+@contextmanager
+def extraction_slot():
+    """Hold one of MAX_CONCURRENT_EXTRACTIONS slots; queue (bounded) if all are busy."""
+    global _waiting
+    if not _slots.acquire(blocking=False):
+        with _waiting_lock:
+            if _waiting >= MAX_QUEUED_EXTRACTIONS:
+                full = True
+            else:
+                full = False
+                _waiting += 1
+        if full:
+            incr("rejected_busy")
+            raise AdmissionRejected("rejected_busy", "We're busy right now. Please try again shortly.")
+
+        incr("queued")
+        try:
+            got = _slots.acquire(timeout=QUEUE_TIMEOUT_S)
+        finally:
+            with _waiting_lock:
+                _waiting -= 1
+        if not got:
+            incr("rejected_busy")
+            raise AdmissionRejected("rejected_busy", "We're busy right now. Please try again shortly.")
+    try:
+        yield
+    finally:
+        _slots.release()
@@ -0,0 +1,117 @@
+# lib/applications.py
+import io
+import json
+
+from lib.db import SessionLocal, Candidate, Application
+from lib.admission import check_upload_size, extraction_slot, incr, refund_token, take_token
+from lib.matching import get_job_index, resume_words, save_matches
+from lib.pdf_utils import extract_pdf_text_from_upload
+from lib.storage import save_resume, delete_resume
+
+
+def upsert_application(db, job_id: int, name: str, email: str, phone: str,
+                       experience_years: float, skills: str, resume_path: str,
+                       scores: dict, missing: list, summary: str = "") -> bool:
+    """
+    Create/update the candidate (email is identity) and their application to
+    job_id, plus their row of the match matrix ({job_id: match_pct}).
+    Caller commits.
+    Returns True if the application already existed.
+    """
+    safe_email = email.strip().lower()
+    match_pct = scores[job_id]
+
+    cand = db.query(Candidate).filter(Candidate.email == safe_email).one_or_none()
+    if cand is None:
+        cand = Candidate(
+            name=name.strip(),
+            email=safe_email,
+            phone=(phone or "").strip(),
+            experience_years=float(experience_years),
+            skills=(skills or "").strip(),
+            resume_path=resume_path,
+        )
+        db.add(cand)
+        db.flush()
+    else:
+        cand.name = name.strip()
+        cand.phone = (phone or "").strip()
+        cand.experience_years = float(experience_years)
+        cand.skills = (skills or "").strip()
+        cand.resume_path = resume_path
+
+    app = (
+        db.query(Application)
+        .filter(Application.job_id == job_id, Application.candidate_id == cand.id)
+        .one_or_none()
+    )
+
+    updated = app is not None
+    if app:
+        app.resume_path = resume_path
+        app.match_pct = float(match_pct)
+        app.missing_keywords = json.dumps(missing, ensure_ascii=False)
+        app.profile_summary = summary
+    else:
+        app = Application(
+            job_id=job_id,
+            candidate_id=cand.id,
+            match_pct=float(match_pct),
+            missing_keywords=json.dumps(missing, ensure_ascii=False),
+            profile_summary=summary,
+            resume_path=resume_path,
+        )
+        db.add(app)
+
+    # keep the candidate x job match matrix current for HR recommendations
+    save_matches(db, cand.id, scores)
+    return updated
+
+
+def submit_application(jobs, job_id: int, name: str, email: str, phone: str,
+                       experience_years: float, skills: str, data: bytes,
+                       session_id: str, summary: str = "") -> dict:
+    """
+    Full Candidate Apply flow: admission checks, resume upload, extraction,
+    scoring against every job, and the DB upsert.
+
+    Raises AdmissionRejected when the submission is refused; any other error
+    means the save failed (the rate-limit token is refunded and the upload
+    removed). Returns {"updated", "match_pct", "missing", "scores"}.
+    """
+    safe_email = email.strip().lower()
+    rate_keys = [f"email:{safe_email}", f"session:{session_id}"]
+
+    check_upload_size(len(data))
+    take_token(rate_keys)
+
+    resume_path = None
+    try:
+        resume_path = save_resume(data, name)
+        with extraction_slot():
+            try:
+                resume_text = extract_pdf_text_from_upload(io.BytesIO(data)) or ""
+            except Exception:
+                resume_text = ""
+
+            # one pass over the (cached) keyword -> jobs index scores every open job at once
+            index = get_job_index(jobs)
+            res_words = resume_words(resume_text, skills)
+            scores = index.score(res_words)
+            missing = index.missing(job_id, res_words)
+
+        with SessionLocal() as db:
+            updated = upsert_application(
+                db, job_id, name, safe_email, phone, experience_years, skills,
+                resume_path, scores, missing, summary,
+            )
+            db.commit()
+    except Exception:
+        # busy or server-side failure: don't charge the applicant's rate limit
+        refund_token(rate_keys)
+        if resume_path:
+            delete_resume(resume_path)
+        raise
+
+    incr("accepted")
+    return {"updated": updated, "match_pct": scores[job_id], "missing": missing, "scores": scores}
@@ -0,0 +1,348 @@
+# lib/matching.py
+import datetime as dt
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+
+from lib.db import Application, Candidate, Job, JobMatch, UnreadableResume
+from lib.pdf_utils import extract_pdf_text_from_file
+from lib.storage import resume_file
+
+# -------------------------------
+# Simple keyword-based scorer (resume+skills vs JD)
+# -------------------------------
+STOPWORDS = {
+    "and","or","the","a","an","to","for","in","of","on","at","by","with","is","are",
+    "was","were","be","been","it","as","that","this","these","those","from","into",
+    "your","you","we","our","their","they","i","he","she","them","us","will","can",
+    "may","might","should","could","would","over","under","between","within","per",
+    "using","use","used","etc","&","+","-","/","\\"
+}
+
+TECH_KEEP = {"c", "c++", "c#", "go", "r", "sql"}  # don't drop short tech tokens
+
+MAX_MISSING = 20
+
+
+def tokenize(text: str) -> list[str]:
+    # capture words, digits, and common tech tokens (#, +, .)
+    words = re.findall(r"[A-Za-z0-9+#\.]{1,}", (text or "").lower())
+    out = []
+    for w in words:
+        if w in STOPWORDS:
+            continue
+        # keep very short only if technical (e.g., 'c', 'r')
+        if len(w) < 2 and w not in TECH_KEEP:
+            continue
+        # drop single-character punctuation-like tokens
+        if len(w) == 1 and w not in TECH_KEEP:
+            continue
+        out.append(w)
+    return out
+
+
+def keywords_from_text(text: str, top_cap: int = 120) -> set[str]:
+    toks = tokenize(text)
+    freq = {}
+    for t in toks:
+        freq[t] = freq.get(t, 0) + 1
+    ranked = sorted(freq.items(), key=lambda kv: (-kv[1], kv[0]))
+    keep = [w for w, c in ranked if c >= 2]
+    if len(keep) < 40:
+        keep = [w for w, _ in ranked][:top_cap]
+    return set(keep[:top_cap])
+
+
+def resume_words(resume_text: str, extra_skills_csv: str = "") -> set[str]:
+    res_words = set(tokenize(resume_text))
+
+    # include typed skills as additional evidence
+    if (extra_skills_csv or "").strip():
+        for s in re.split(r"[,\n;]+", extra_skills_csv.lower()):
+            s = s.strip()
+            if s:
+                res_words.update(tokenize(s))
+    return res_words
+
+
+def compute_match(resume_text: str, jd_text: str, extra_skills_csv: str = ""):
+    """Score one resume against one JD; the reference JobIndex is tested against."""
+    jd_keys = keywords_from_text(jd_text)
+    res_words = resume_words(resume_text, extra_skills_csv)
+
+    if not jd_keys:
+        return 0.0, [], ""
+
+    overlap = jd_keys & res_words
+    match_pct = (len(overlap) / len(jd_keys)) * 100.0
+    missing = sorted(list(jd_keys - res_words))[:MAX_MISSING]
+    summary = ""  # keep empty per your requirement
+
+    return max(0.0, min(100.0, match_pct)), missing, summary
+
+
+# -------------------------------
+# Inverted index: keyword -> jobs
+# -------------------------------
+class JobIndex:
+    """
+    Maps every JD keyword to the jobs that contain it, so one resume can be
+    scored against all jobs by walking only the resume's own words.
+    Scores are identical to calling compute_match() once per job; missing
+    keywords are computed separately, only for the jobs that need them.
+    """
+
+    def __init__(self, jobs: Iterable[Tuple[int, str]]):
+        self.postings: Dict[str, Set[int]] = {}
+        self.job_keys: Dict[int, Set[str]] = {}
+        for job_id, description in jobs:
+            keys = keywords_from_text(description)
+            self.job_keys[job_id] = keys
+            for k in keys:
+                self.postings.setdefault(k, set()).add(job_id)
+
+    def __len__(self) -> int:
+        return len(self.job_keys)
+
+    def score(self, res_words: Set[str], job_ids: Optional[Iterable[int]] = None) -> Dict[int, float]:
+        """Return {job_id: match_pct} for every indexed job (or only job_ids)."""
+        wanted = self.job_keys.keys() if job_ids is None else set(job_ids) & self.job_keys.keys()
+
+        hits: Dict[int, int] = {}
+        for w in res_words:
+            for jid in self.postings.get(w, ()):
+                hits[jid] = hits.get(jid, 0) + 1
+
+        out = {}
+        for jid in wanted:
+            n_keys = len(self.job_keys[jid])
+            out[jid] = min(100.0, hits.get(jid, 0) / n_keys * 100.0) if n_keys else 0.0
+        return out
+
+    def missing(self, job_id: int, res_words: Set[str]) -> List[str]:
+        return sorted(self.job_keys[job_id] - res_words)[:MAX_MISSING]
+
+
+def build_job_index(jobs: Iterable[Job]) -> JobIndex:
+    return JobIndex((j.id, j.description) for j in jobs)
+
+
+_index_lock = threading.Lock()
+_index_cache: Optional[Tuple[tuple, JobIndex]] = None
+
+
+def get_job_index(jobs: Iterable[Job]) -> JobIndex:
+    """
+    Shared JobIndex for the current set of jobs, rebuilt whenever a job is
+    added, removed or changed. The key includes created_at and the description
+    so a reused id (SQLite after a delete) or a restored DB never hits a stale index.
+    """
+    global _index_cache
+    jobs = list(jobs)
+    key = tuple(sorted((j.id, j.created_at, hash(j.description)) for j in jobs))
+    with _index_lock:
+        if _index_cache is None or _index_cache[0] != key:
+            _index_cache = (key, build_job_index(jobs))
+        return _index_cache[1]
+
+
+# -------------------------------
+# Candidate x Job match matrix
+# -------------------------------
+UPSERT_CHUNK = 500
+
+
+def utcnow() -> dt.datetime:
+    # naive UTC with microseconds; JobMatch.computed_at is compared against it
+    return dt.datetime.now(dt.timezone.utc).replace(tzinfo=None)
+
+
+def save_matches(db, candidate_id: int, scores: Dict[int, float],
+                 only_missing: bool = False, stale_before: Optional[dt.datetime] = None):
+    """
+    Upsert JobMatch rows ({job_id: match_pct}) for one candidate. Caller commits.
+
+    Each pair is written on its own so one conflict never drops the others.
+    only_missing=True leaves existing rows alone; stale_before only replaces
+    rows computed before that time. The background worker uses these so it
+    never overwrites scores the apply flow wrote from a newer resume.
+    """
+    now = utcnow()
+    rows = [
+        {"job_id": jid, "candidate_id": candidate_id, "match_pct": float(pct), "computed_at": now}
+        for jid, pct in scores.items()
+    ]
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite_insert if dialect == "sqlite" else pg_insert
+        for i in range(0, len(rows), UPSERT_CHUNK):
+            stmt = insert(JobMatch).values(rows[i:i + UPSERT_CHUNK])
+            if only_missing:
+                stmt = stmt.on_conflict_do_nothing(index_elements=["job_id", "candidate_id"])
+            else:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["job_id", "candidate_id"],
+                    set_={"match_pct": stmt.excluded.match_pct, "computed_at": stmt.excluded.computed_at},
+                    where=None if stale_before is None else JobMatch.__table__.c.computed_at < stale_before,
+                )
+            db.execute(stmt)
+        return
+
+    # other backends: update, else insert in a savepoint and fall back to update
+    for r in rows:
+        pair = db.query(JobMatch).filter(
+            JobMatch.job_id == r["job_id"], JobMatch.candidate_id == candidate_id
+        )
+        if stale_before is not None:
+            pair = pair.filter(JobMatch.computed_at < stale_before)
+        values = {JobMatch.match_pct: r["match_pct"], JobMatch.computed_at: now}
+        if not only_missing and pair.update(values, synchronize_session=False):
+            continue
+        try:
+            with db.begin_nested():
+                db.add(JobMatch(**r))
+        except IntegrityError:
+            if not only_missing:
+                pair.update(values, synchronize_session=False)
+
+
+def latest_resume_paths(db, candidate_ids: Optional[List[int]] = None) -> Dict[int, str]:
+    """
+    Current resume path per candidate (optionally only for candidate_ids).
+    Candidates saved before Candidate.resume_path existed fall back to their
+    newest application.
+    """
+    apps = db.query(Application.candidate_id, Application.resume_path)
+    cands = db.query(Candidate.id, Candidate.resume_path).filter(Candidate.resume_path.isnot(None))
+    if candidate_ids is not None:
+        apps = apps.filter(Application.candidate_id.in_(candidate_ids))
+        cands = cands.filter(Candidate.id.in_(candidate_ids))
+
+    latest = {}
+    for cid, path in apps.order_by(Application.candidate_id, Application.created_at):
+        latest[cid] = path
+    for cid, path in cands:
+        latest[cid] = path
+    return latest
+
+
+def candidates_missing_pairs(db, job_count: int) -> List[int]:
+    """Candidates with fewer JobMatch rows (for existing jobs) than there are jobs."""
+    counts = (
+        select(JobMatch.candidate_id.label("cid"), func.count().label("n"))
+        .join(Job, Job.id == JobMatch.job_id)
+        .group_by(JobMatch.candidate_id)
+        .subquery()
+    )
+    return [
+        cid for (cid,) in db.query(Candidate.id)
+        .outerjoin(counts, counts.c.cid == Candidate.id)
+        .filter(func.coalesce(counts.c.n, 0) < job_count)
+    ]
+
+
+UNREADABLE_RETRY_S = 600          # first retry of an unreadable resume after 10 min ...
+UNREADABLE_MAX_RETRY_S = 86400    # ... doubling up to once a day
+REFRESH_CHUNK = 500
+
+
+def _mark_unreadable(db, path: str, now: float):
+    row = db.get(UnreadableResume, path)
+    if row is None:
+        row = UnreadableResume(resume_path=path, failures=0)
+        db.add(row)
+    row.failures += 1
+    row.retry_at = now + min(UNREADABLE_RETRY_S * 2 ** (row.failures - 1), UNREADABLE_MAX_RETRY_S)
+    db.commit()
+
+
+def refresh_match_matrix(db, full: bool = False) -> dict:
+    """
+    Incrementally fill the candidate x job match matrix.
+
+    Only pairs without a JobMatch row are scored (new jobs, new candidates);
+    pass full=True to rescore every pair. Candidates with gaps are found in
+    SQL; each one's resume is extracted once and scored against all needed
+    jobs in a single index pass. Unreadable resumes are retried with backoff.
+    Rows the apply flow writes while this runs are never overwritten.
+    """
+    started = utcnow()
+    now = time.time()
+    stats = {"candidates": 0, "pairs": 0, "unreadable": 0, "backed_off": 0}
+
+    jobs = db.query(Job).all()
+    if not jobs:
+        return stats
+    index = build_job_index(jobs)
+    all_job_ids = set(index.job_keys)
+
+    if full:
+        pending = [cid for (cid,) in db.query(Candidate.id)]
+    else:
+        pending = candidates_missing_pairs(db, len(jobs))
+    if not pending:
+        return stats
+
+    backoff = dict(db.query(UnreadableResume.resume_path, UnreadableResume.retry_at))
+
+    for i in range(0, len(pending), REFRESH_CHUNK):
+        chunk = pending[i:i + REFRESH_CHUNK]
+        paths = latest_resume_paths(db, chunk)
+        skills = dict(db.query(Candidate.id, Candidate.skills).filter(Candidate.id.in_(chunk)))
+        have: Dict[int, Set[int]] = {}
+        if not full:
+            for cid, jid in db.query(JobMatch.candidate_id, JobMatch.job_id).filter(JobMatch.candidate_id.in_(chunk)):
+                have.setdefault(cid, set()).add(jid)
+
+        for cid, path in paths.items():
+            needed = all_job_ids - have.get(cid, set())
+            if not needed:
+                continue
+            if backoff.get(path, 0.0) > now:
+                stats["backed_off"] += 1
+                continue
+            try:
+                resume_text = extract_pdf_text_from_file(str(resume_file(path))) or ""
+            except Exception:
+                _mark_unreadable(db, path, now)
+                stats["unreadable"] += 1
+                continue
+
+            scores = index.score(resume_words(resume_text, skills.get(cid) or ""), job_ids=needed)
+            if full:
+                save_matches(db, cid, scores, stale_before=started)
+            else:
+                save_matches(db, cid, scores, only_missing=True)
+            if path in backoff:
+                db.query(UnreadableResume).filter(UnreadableResume.resume_path == path).delete()
+            db.commit()
+            stats["candidates"] += 1
+            stats["pairs"] += len(scores)
+
+    return stats
+
+
+def recommend_candidates(db, job_id: int, min_match: float = 0.0, limit: int = 25):
+    """
+    Candidates who applied elsewhere but not to job_id, ranked by their
+    precomputed match for job_id. Returns [(Candidate, JobMatch), ...].
+    """
+    applied = select(Application.candidate_id).where(Application.job_id == job_id)
+    return (
+        db.query(Candidate, JobMatch)
+        .join(JobMatch, JobMatch.candidate_id == Candidate.id)
+        .filter(
+            JobMatch.job_id == job_id,
+            JobMatch.match_pct >= float(min_match),
+            ~Candidate.id.in_(applied),
+        )
+        .order_by(JobMatch.match_pct.desc())
+        .limit(limit)
+        .all()
+    )
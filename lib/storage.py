@@ -0,0 +1,43 @@
+# lib/storage.py
+import os
+import re
+import uuid
+from pathlib import Path
+
+# Point every replica at the same shared directory (NFS/EFS/volume mount),
+# e.g. export UPLOAD_ROOT="/mnt/shared/uploads"
+UPLOAD_ROOT = Path(os.getenv("UPLOAD_ROOT", "uploads"))
+
+
+def save_resume(data: bytes, name: str) -> str:
+    """
+    Write a resume under UPLOAD_ROOT and return the path to store in the DB.
+    The stored path is relative to UPLOAD_ROOT so replicas can mount the
+    shared directory at different locations.
+    """
+    UPLOAD_ROOT.mkdir(parents=True, exist_ok=True)
+    base_name = re.sub(r"[^A-Za-z0-9_\-]+", "_", (name or "").strip()) or "resume"
+    fname = f"{base_name}_{uuid.uuid4().hex[:8]}.pdf"
+    tmp = UPLOAD_ROOT / f".{fname}.part"
+    with open(tmp, "wb") as out:
+        out.write(data)
+    # atomic on the same filesystem: other replicas never see a half-written file
+    os.replace(tmp, UPLOAD_ROOT / fname)
+    return fname
+
+
+LEGACY_UPLOAD_DIR = "uploads"  # rows written before UPLOAD_ROOT store "uploads/<file>"
+
+
+def resume_file(stored_path: str) -> Path:
+    """Resolve a stored resume path (new relative names or legacy 'uploads/...' paths)."""
+    p = Path(stored_path)
+    if p.is_absolute():
+        return p
+    if len(p.parts) > 1 and p.parts[0] == LEGACY_UPLOAD_DIR:
+        p = Path(*p.parts[1:])
+    return UPLOAD_ROOT / p
+
+
+def delete_resume(stored_path: str):
+    resume_file(stored_path).unlink(missing_ok=True)
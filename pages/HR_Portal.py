@@ -16,9 +16,18 @@ from sqlalchemy.orm import joinedload
 
 from lib.db import SessionLocal, Job, Application, Interview
 from lib.notify import send_email
+from lib.matching import recommend_candidates
+from lib.admission import get_counters
+from lib.storage import resume_file
 
 st.title("HR Portal")
 
+with st.expander("Submission stats"):
+    counters = get_counters()
+    scols = st.columns(len(counters))
+    for col, (name, count) in zip(scols, counters.items()):
+        col.metric(name.replace("_", " ").capitalize(), count)
+
 # ---- Create Job (in a form) ----
 with st.form("create_job"):
     title = st.text_input("Job Title", placeholder="e.g., Senior Data Analyst")
@@ -49,6 +58,25 @@ job_id = job_label_to_id[choice]
 
 min_match = st.slider("Minimum Match %", 0, 100, 70, 5)
 
+# ---- Recommend candidates from other applicants (precomputed match matrix) ----
+with st.expander("Recommended from other applicants"):
+    st.caption(
+        "Scores for newly posted jobs are filled in by the background match worker "
+        "(scripts/compute_matches.py --loop)."
+    )
+
+    with SessionLocal() as db:
+        recs = recommend_candidates(db, job_id, min_match=min_match)
+
+    if not recs:
+        st.info("No other applicants meet the threshold for this job.")
+    for c, m in recs:
+        rcols = st.columns([2.2, 2.2, 1.0, 1.4])
+        rcols[0].write(c.name)
+        rcols[1].write(c.email)
+        rcols[2].write(f"{round(m.match_pct, 2)}%")
+        rcols[3].write(c.phone or "")
+
 # ---- Load applications with candidate eagerly loaded ----
 with SessionLocal() as db:
     apps = (
@@ -81,9 +109,20 @@ hcols[4].markdown("**Resume**")
 hcols[5].markdown("**Schedule Interview**")
 hcols[6].markdown("**Phone**")
 
-# ensure session key for which app to schedule
+# ensure session key for which app to schedule; mirrored in the URL so the
+# selection survives a reconnect that lands on a different replica
 if "schedule_for_app" not in st.session_state:
-    st.session_state["schedule_for_app"] = None
+    qp = st.query_params.get("schedule")
+    st.session_state["schedule_for_app"] = int(qp) if qp and qp.isdigit() else None
+
+
+def select_for_schedule(app_id):
+    st.session_state["schedule_for_app"] = app_id
+    if app_id is None:
+        st.query_params.pop("schedule", None)
+    else:
+        st.query_params["schedule"] = str(app_id)
+
 
 for a in apps:
     c = a.candidate
@@ -102,7 +141,7 @@ for a in apps:
 
     # View/Download Resume (actual PDF control, not the path text)
     try:
-        with open(resume_path, "rb") as f:
+        with open(resume_file(resume_path), "rb") as f:
             cols[4].download_button(
                 "View/Download",
                 f,
@@ -119,7 +158,8 @@ for a in apps:
         key=f"schedule_{a.id}",
         disabled=not eligible,
         help="Enabled for candidates with ≥ 75% match",
-        on_click=lambda app_id=a.id: st.session_state.__setitem__("schedule_for_app", app_id),
+        on_click=select_for_schedule,
+        args=(a.id,),
     )
 
     # Phone (optional)
@@ -215,4 +255,4 @@ if selected_app_id:
             else:
                 st.success("Interview scheduled & emails sent.")
                 # Reset so the form hides
-                st.session_state["schedule_for_app"] = None
+                select_for_schedule(None)
@@ -0,0 +1,54 @@
+# scripts/compute_matches.py
+"""
+Batch job / background worker: fill the candidate x job match matrix (and
+drop idle rate-limit buckets).
+
+Run after new jobs are posted or resumes arrive (e.g. from cron):
+    python scripts/compute_matches.py             # only missing pairs
+    python scripts/compute_matches.py --full      # rescore everything
+
+Or keep it running next to the Streamlit replicas, outside the UI process:
+    python scripts/compute_matches.py --loop 60   # poll every 60 s
+"""
+from pathlib import Path
+import sys
+import time
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from lib.admission import prune_buckets
+from lib.db import SessionLocal, init_db
+from lib.matching import refresh_match_matrix
+
+
+def run_once(full: bool = False):
+    with SessionLocal() as db:
+        stats = refresh_match_matrix(db, full=full)
+    print(
+        f"Scored {stats['pairs']} pairs for {stats['candidates']} candidates "
+        f"({stats['unreadable']} unreadable resumes, {stats['backed_off']} waiting to retry).",
+        flush=True,
+    )
+    pruned = prune_buckets()
+    if pruned:
+        print(f"Pruned {pruned} idle rate-limit buckets.", flush=True)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    full = "--full" in args
+    interval = float(args[args.index("--loop") + 1]) if "--loop" in args else None
+
+    init_db()
+    run_once(full=full)
+    while interval:
+        time.sleep(interval)
+        try:
+            run_once()
+        except Exception as e:
+            # keep the worker alive across transient DB errors
+            print(f"Match refresh failed: {e}", file=sys.stderr, flush=True)
@@ -0,0 +1,274 @@
+# scripts/load_test.py
+"""
+Local load test for multi-replica deployments.
+
+Starts R replica processes (each one stands in for a Streamlit server) against
+the same DATABASE_URL and UPLOAD_ROOT, spreads N applicant and M HR sessions
+across them round-robin (like a load balancer), and runs each session as a
+thread in its replica (like Streamlit does). Sessions run the same lib code as
+the pages: admission checks, resume upload, PDF extraction, scoring against
+every job, application upsert; HR lists candidates, recommendations, resumes.
+
+    python scripts/load_test.py --replicas 1,2,4 --applicants 8 --hr 4 --duration 15
+
+Without --db / --upload-root a throwaway SQLite file and upload dir are used.
+"""
+from pathlib import Path
+import sys
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import argparse
+import multiprocessing as mp
+import os
+import queue
+import random
+import tempfile
+import threading
+import time
+
+VOCAB = (
+    "python sql go c++ java rust react node docker kubernetes aws gcp azure spark "
+    "airflow kafka pandas numpy pytorch tensorflow ml nlp etl warehouse tableau "
+    "excel agile scrum linux bash terraform ci cd git rest graphql postgres redis "
+    "mongodb microservices security testing analytics statistics leadership"
+).split()
+
+
+def make_pdf(text: str) -> bytes:
+    """Minimal one-page text PDF (enough for PyPDF2 extraction)."""
+    lines = [text[i:i + 90] for i in range(0, len(text), 90)] or [""]
+    esc = [l.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for l in lines]
+    stream = "BT /F1 10 Tf 40 760 Td 12 TL " + " ".join(f"({l}) Tj T*" for l in esc) + " ET"
+    objs = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        "/Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for i, o in enumerate(objs, 1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n{o}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objs) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{off:010d} 00000 n \n" for off in offsets).encode()
+    out += f"trailer\n<< /Size {len(objs) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+def seed_jobs(n_jobs: int):
+    from lib.db import SessionLocal, Job, init_db
+
+    init_db()
+    rnd = random.Random(0)
+    with SessionLocal() as db:
+        have = db.query(Job).count()
+        for i in range(have, n_jobs):
+            db.add(Job(title=f"Load test role {i}", description=" ".join(rnd.choices(VOCAB, k=150))))
+        db.commit()
+
+
+# -------------------------------
+# Simulated sessions (run inside a replica process)
+# -------------------------------
+def applicant_op(rnd, resumes, stats):
+    from sqlalchemy import select
+    from lib.db import SessionLocal, Job
+    from lib.applications import submit_application
+
+    # same flow as pages/Candidate_Apply.py after the form is submitted
+    with SessionLocal() as db:
+        jobs = db.execute(select(Job).order_by(Job.created_at.desc())).scalars().all()
+    email = f"cand{rnd.randrange(1_000_000)}@example.com"
+    submit_application(
+        jobs, rnd.choice(jobs).id, "Load Test", email, "", 3.0,
+        ", ".join(rnd.sample(VOCAB, 5)), rnd.choice(resumes), stats["sid"],
+    )
+
+
+def hr_op(rnd, _resumes, _stats):
+    from sqlalchemy import select
+    from sqlalchemy.orm import joinedload
+    from lib.db import SessionLocal, Job, Application
+    from lib.matching import recommend_candidates
+    from lib.storage import resume_file
+
+    with SessionLocal() as db:
+        jobs = db.execute(select(Job).order_by(Job.created_at.desc())).scalars().all()
+        job_id = rnd.choice(jobs).id
+        apps = (
+            db.query(Application)
+            .options(joinedload(Application.candidate))
+            .filter(Application.job_id == job_id, Application.match_pct >= 30.0)
+            .order_by(Application.match_pct.desc(), Application.created_at.desc())
+            .all()
+        )
+        recommend_candidates(db, job_id, min_match=30.0)
+    for a in apps[:10]:
+        with open(resume_file(a.resume_path), "rb") as f:
+            f.read()
+
+
+def run_session(kind, seed, deadline, resumes, results):
+    op = applicant_op if kind == "applicant" else hr_op
+    rnd = random.Random(seed)
+    stats = {"kind": kind, "sid": f"{kind}-{seed}", "ok": 0, "errors": {}, "lat": []}
+    while time.time() < deadline:
+        t0 = time.perf_counter()
+        try:
+            op(rnd, resumes, stats)
+        except Exception as e:
+            key = type(e).__name__
+            stats["errors"][key] = stats["errors"].get(key, 0) + 1
+        else:
+            stats["ok"] += 1
+            stats["lat"].append(time.perf_counter() - t0)
+    results.append(stats)
+
+
+def replica_main(replica, sessions, start_at, duration, resume_paths, out_q):
+    resumes = [Path(p).read_bytes() for p in resume_paths]
+    # warm imports/engine before the clock starts
+    from lib.db import engine
+    with engine.connect():
+        pass
+
+    time.sleep(max(0.0, start_at - time.time()))
+    deadline = time.time() + duration
+    results = []
+    threads = [
+        threading.Thread(target=run_session, args=(kind, seed, deadline, resumes, results))
+        for kind, seed in sessions
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # spawned children skip atexit, so write buffered counters before reporting
+    from lib.admission import flush_counters
+    flush_counters()
+    out_q.put((replica, results))
+
+
+# -------------------------------
+# Driver
+# -------------------------------
+REPLICA_GRACE_S = 120.0  # time past the run's end a replica may take to report
+def run_point(n_replicas, n_applicants, n_hr, duration, resume_paths):
+    # fresh seeds per sweep point so each point submits new candidates, not replays
+    base_seed = n_replicas * 100_000
+    sessions = (
+        [("applicant", base_seed + i) for i in range(n_applicants)]
+        + [("hr", base_seed + 50_000 + i) for i in range(n_hr)]
+    )
+    per_replica = [sessions[r::n_replicas] for r in range(n_replicas)]
+
+    ctx = mp.get_context("spawn")
+    out_q = ctx.Queue()
+    start_at = time.time() + 3.0
+    procs = [
+        ctx.Process(target=replica_main, args=(i, s, start_at, duration, resume_paths, out_q))
+        for i, s in enumerate(per_replica)
+    ]
+    for p in procs:
+        p.start()
+
+    results, pending = [], set(range(n_replicas))
+    give_up = start_at + duration + REPLICA_GRACE_S
+    while pending:
+        try:
+            replica, rows = out_q.get(timeout=1.0)
+        except queue.Empty:
+            crashed = {i: procs[i].exitcode for i in pending if procs[i].exitcode not in (None, 0)}
+            if crashed or time.time() > give_up:
+                for p in procs:
+                    if p.is_alive():
+                        p.terminate()
+                reason = f"exit codes {crashed}" if crashed else f"no result after {REPLICA_GRACE_S:g}s grace"
+                raise RuntimeError(f"replica(s) {sorted(crashed or pending)} failed: {reason}")
+            continue
+        pending.discard(replica)
+        results.extend(rows)
+    for p in procs:
+        p.join()
+
+    def summarize(kind):
+        rows = [r for r in results if r["kind"] == kind]
+        ok = sum(r["ok"] for r in rows)
+        lat = sorted(l for r in rows for l in r["lat"])
+        p95 = lat[int(0.95 * (len(lat) - 1))] * 1000 if lat else 0.0
+        errors = {}
+        for r in rows:
+            for k, v in r["errors"].items():
+                errors[k] = errors.get(k, 0) + v
+        return ok, p95, errors
+
+    return summarize("applicant"), summarize("hr")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--replicas", default="1,2,4", help="comma-separated replica counts to sweep")
+    ap.add_argument("--applicants", type=int, default=8, help="simulated applicant sessions (total)")
+    ap.add_argument("--hr", type=int, default=4, help="simulated HR sessions (total)")
+    ap.add_argument("--duration", type=float, default=15.0, help="seconds per sweep point")
+    ap.add_argument("--jobs", type=int, default=200, help="open jobs to seed")
+    ap.add_argument("--db", help="DATABASE_URL to test (default: temp SQLite file)")
+    ap.add_argument("--upload-root", help="shared UPLOAD_ROOT (default: temp dir)")
+    ap.add_argument("--respect-rate-limits", action="store_true",
+                    help="keep APPLY_BURST/APPLY_PER_HOUR instead of lifting them for the test")
+    args = ap.parse_args()
+
+    work = Path(tempfile.mkdtemp(prefix="ats_load_"))
+    # replicas are spawned processes and inherit this environment
+    os.environ["DATABASE_URL"] = args.db or f"sqlite:///{work / 'load.db'}"
+    os.environ["UPLOAD_ROOT"] = args.upload_root or str(work / "uploads")
+    if not args.respect_rate_limits:
+        os.environ["APPLY_BURST"] = "1000000"
+
+    seed_jobs(args.jobs)
+    rnd = random.Random(1)
+    resume_paths = []
+    for i in range(20):
+        p = work / f"resume_{i}.pdf"
+        p.write_bytes(make_pdf(" ".join(rnd.choices(VOCAB, k=300))))
+        resume_paths.append(str(p))
+
+    from lib.admission import get_counters
+
+    print(f"DATABASE_URL={os.environ['DATABASE_URL']}")
+    print(f"UPLOAD_ROOT={os.environ['UPLOAD_ROOT']}")
+    print(f"{args.applicants} applicant + {args.hr} HR sessions, {args.duration:g}s per point, {args.jobs} jobs\n")
+    print(f"{'replicas':>8} {'apply/s':>8} {'p95 ms':>8} {'hr/s':>8} {'p95 ms':>8} {'total/s':>8} {'speedup':>8}  errors")
+
+    base = None
+    for n in [int(x) for x in args.replicas.split(",") if x.strip()]:
+        before = get_counters()["accepted"]
+        try:
+            (a_ok, a_p95, a_err), (h_ok, h_p95, h_err) = run_point(
+                n, args.applicants, args.hr, args.duration, resume_paths
+            )
+        except RuntimeError as e:
+            raise SystemExit(f"{n:>8}  !! {e}")
+        total = (a_ok + h_ok) / args.duration
+        if base is None:
+            base = total
+        speedup = f"{total / base:>7.2f}x" if base else "     n/a"
+        errors = {**{f"apply:{k}": v for k, v in a_err.items()}, **{f"hr:{k}": v for k, v in h_err.items()}}
+        print(
+            f"{n:>8} {a_ok / args.duration:>8.1f} {a_p95:>8.0f} {h_ok / args.duration:>8.1f} "
+            f"{h_p95:>8.0f} {total:>8.1f} {speedup}  {errors or '-'}"
+        )
+        # every successful submission must be visible to all replicas via the shared DB
+        counted = get_counters()["accepted"] - before
+        if counted != a_ok:
+            print(f"  !! accepted counter moved by {counted}, expected {a_ok}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,11 @@
 import os
 import sqlite3
 
-DB_URL = os.getenv("DATABASE_URL", "sqlite:///ats.db")
+from dotenv import load_dotenv
+load_dotenv()
+
+# same default as lib/db.py
+DB_URL = os.getenv("DATABASE_URL", "sqlite:///smart_ats.db")
 if DB_URL.startswith("sqlite:///"):
     DB_PATH = DB_URL.replace("sqlite:///", "")
 else:
@@ -11,13 +15,19 @@ else:
 conn = sqlite3.connect(DB_PATH)
 cur = conn.cursor()
 
+def has_table(table: str) -> bool:
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,))
+    return cur.fetchone() is not None
+
 def has_column(table: str, col: str) -> bool:
     cur.execute(f"PRAGMA table_info({table})")
     return any(row[1] == col for row in cur.fetchall())
 
 def add_col(table: str, col_def: str):
     col_name = col_def.split()[0]
-    if not has_column(table, col_name):
+    if not has_table(table):
+        print(f"{table} does not exist yet (init_db() will create it)")
+    elif not has_column(table, col_name):
         print(f"Adding {table}.{col_name} ...")
         cur.execute(f"ALTER TABLE {table} ADD COLUMN {col_def}")
     else:
@@ -25,6 +35,7 @@ def add_col(table: str, col_def: str):
 
 # Patch candidates.created_at
 add_col("candidates", 'created_at DATETIME DEFAULT CURRENT_TIMESTAMP')
+add_col("candidates", 'resume_path VARCHAR(1024)')
 
 # Patch applications columns used by the app
 add_col("applications", 'created_at DATETIME DEFAULT CURRENT_TIMESTAMP')
@@ -0,0 +1,28 @@
+# tests/conftest.py
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# lib.db binds its engine at import time, so point it at a scratch DB first
+_TMP = Path(tempfile.mkdtemp(prefix="smart_ats_tests_"))
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP / 'test.db'}"
+os.environ["UPLOAD_ROOT"] = str(_TMP / "uploads")
+os.environ["APPLY_BURST"] = "3"
+os.environ["APPLY_PER_HOUR"] = "1"
+os.environ["COUNTER_FLUSH_S"] = "0"  # write through; batching has its own test
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from lib.db import Base, engine  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fresh_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
@@ -0,0 +1,193 @@
+# tests/test_admission.py
+import threading
+import time
+
+import pytest
+
+from lib import admission
+from lib.admission import AdmissionRejected, get_counters, incr, prune_buckets, refund_token, take_token
+from lib.db import SessionLocal, AdmissionCounter, RateLimitBucket
+
+
+def run_concurrently(fn, n=8):
+    barrier = threading.Barrier(n)
+    results = []
+
+    def worker():
+        barrier.wait()
+        try:
+            fn()
+        except AdmissionRejected:
+            results.append("rejected")
+        except Exception as e:  # anything else is a bug
+            results.append(type(e).__name__)
+        else:
+            results.append("ok")
+
+    threads = [threading.Thread(target=worker) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sorted(results)
+
+
+def test_concurrent_take_token_on_new_key_never_overspends():
+    results = run_concurrently(lambda: take_token(["email:x@y.com"]))
+
+    assert results == ["ok"] * 3 + ["rejected"] * 5
+    assert get_counters()["rejected_rate"] == 5
+
+
+def test_take_token_is_all_or_nothing_across_keys():
+    for _ in range(3):
+        take_token(["session:b"])
+
+    with pytest.raises(AdmissionRejected):
+        take_token(["email:a", "session:b"])
+
+    # "email:a" was not charged by the rejected attempt
+    for _ in range(3):
+        take_token(["email:a"])
+
+
+def test_refund_token_restores_quota():
+    for _ in range(3):
+        take_token(["email:a"])
+    refund_token(["email:a"])
+    take_token(["email:a"])
+    with pytest.raises(AdmissionRejected):
+        take_token(["email:a"])
+
+
+def test_zero_refill_rate_rejects_without_crashing(monkeypatch):
+    monkeypatch.setattr(admission, "APPLY_PER_HOUR", 0.0)
+    for _ in range(3):
+        take_token(["email:a"])
+    with pytest.raises(AdmissionRejected, match="later"):
+        take_token(["email:a"])
+
+
+def test_concurrent_incr_counts_every_call():
+    def bump():
+        for _ in range(10):
+            incr("accepted")
+
+    assert run_concurrently(bump) == ["ok"] * 8
+    assert get_counters()["accepted"] == 80
+
+
+def test_oversized_upload_is_rejected(monkeypatch):
+    monkeypatch.setattr(admission, "MAX_UPLOAD_BYTES", 10)
+    with pytest.raises(AdmissionRejected) as exc:
+        admission.check_upload_size(11)
+    assert exc.value.reason == "rejected_size"
+
+
+@pytest.fixture
+def one_slot(monkeypatch):
+    """One extraction slot, queue of two."""
+    monkeypatch.setattr(admission, "MAX_CONCURRENT_EXTRACTIONS", 1)
+    monkeypatch.setattr(admission, "MAX_QUEUED_EXTRACTIONS", 2)
+    monkeypatch.setattr(admission, "QUEUE_TIMEOUT_S", 10.0)
+    monkeypatch.setattr(admission, "_slots", threading.BoundedSemaphore(1))
+
+
+def test_extraction_slot_queues_then_rejects_overflow(one_slot):
+    results = []
+
+    def submit():
+        try:
+            with admission.extraction_slot():
+                pass
+        except AdmissionRejected as e:
+            results.append(e.reason)
+        else:
+            results.append("ok")
+
+    with admission.extraction_slot():
+        threads = [threading.Thread(target=submit) for _ in range(4)]
+        for t in threads:
+            t.start()
+        # two wait in the queue, the other two find it full
+        deadline = time.time() + 5
+        while (results.count("rejected_busy") < 2 or admission._waiting < 2) and time.time() < deadline:
+            time.sleep(0.01)
+        assert sorted(results) == ["rejected_busy"] * 2
+    for t in threads:
+        t.join()
+
+    assert sorted(results) == ["ok"] * 2 + ["rejected_busy"] * 2
+    counters = get_counters()
+    assert counters["queued"] == 2
+    assert counters["rejected_busy"] == 2
+    assert admission._waiting == 0
+
+
+def test_extraction_slot_queue_timeout_is_rejected(one_slot, monkeypatch):
+    monkeypatch.setattr(admission, "QUEUE_TIMEOUT_S", 0.05)
+    with admission.extraction_slot():
+        with pytest.raises(AdmissionRejected) as exc:
+            with admission.extraction_slot():
+                pass
+    assert exc.value.reason == "rejected_busy"
+
+    assert get_counters()["queued"] == 1
+    assert get_counters()["rejected_busy"] == 1
+    # the slot is free again once the holder is done
+    with admission.extraction_slot():
+        pass
+
+
+def test_batched_incr_writes_once_per_flush(monkeypatch):
+    monkeypatch.setattr(admission, "COUNTER_FLUSH_S", 60.0)
+
+    def bump():
+        for _ in range(10):
+            incr("accepted")
+
+    assert run_concurrently(bump) == ["ok"] * 8
+    with SessionLocal() as db:
+        assert db.query(AdmissionCounter).count() == 0  # still buffered
+    assert get_counters()["accepted"] == 80
+    assert admission._pending == {} and admission._flush_timer is None
+
+
+def bucket_keys():
+    with SessionLocal() as db:
+        return sorted(k for (k,) in db.query(RateLimitBucket.key))
+
+
+def test_prune_buckets_drops_only_fully_refilled_buckets():
+    now = 1_000_000.0
+    refill_s = admission.APPLY_BURST * 3600.0 / admission.APPLY_PER_HOUR
+    with SessionLocal() as db:
+        db.add_all([
+            RateLimitBucket(key="idle", tokens=0.0, updated_at=now - refill_s - 1),
+            RateLimitBucket(key="recent", tokens=3.0, updated_at=now - refill_s + 1),
+        ])
+        db.commit()
+
+    assert prune_buckets(now) == 1
+    assert bucket_keys() == ["recent"]
+
+
+def test_take_token_recreates_a_bucket_pruned_mid_request(monkeypatch):
+    real_ensure = admission._ensure_buckets
+    calls = []
+
+    def ensure_then_prune(keys, now):
+        real_ensure(keys, now)
+        if not calls:
+            # the worker prunes between the existence check and the spend
+            with SessionLocal() as db:
+                db.query(RateLimitBucket).filter(RateLimitBucket.key == "email:a").delete()
+                db.commit()
+        calls.append(now)
+
+    monkeypatch.setattr(admission, "_ensure_buckets", ensure_then_prune)
+    take_token(["email:a", "session:b"])
+
+    assert len(calls) == 2
+    assert get_counters()["rejected_rate"] == 0
+    assert bucket_keys() == ["email:a", "session:b"]
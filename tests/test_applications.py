@@ -0,0 +1,84 @@
+# tests/test_applications.py
+import pytest
+
+from lib import applications
+from lib.admission import AdmissionRejected, get_counters, take_token
+from lib.applications import submit_application, upsert_application
+from lib.db import SessionLocal, Candidate, Job, JobMatch
+from lib.storage import UPLOAD_ROOT
+
+
+@pytest.fixture
+def jobs():
+    with SessionLocal() as db:
+        db.add_all([
+            Job(title="Backend", description="python sql docker python sql docker"),
+            Job(title="Frontend", description="react css html react css html"),
+        ])
+        db.commit()
+        return db.query(Job).order_by(Job.id).all()
+
+
+def test_upsert_overwrites_pairs_written_concurrently(jobs):
+    backend, frontend = jobs
+    with SessionLocal() as db:
+        db.add(Candidate(name="Ann", email="ann@x.com"))
+        db.commit()
+        cand_id = db.query(Candidate.id).scalar()
+
+    # a match worker already scored this candidate, unseen by the apply session
+    with SessionLocal() as worker:
+        worker.add_all([
+            JobMatch(job_id=backend.id, candidate_id=cand_id, match_pct=1.0),
+            JobMatch(job_id=frontend.id, candidate_id=cand_id, match_pct=2.0),
+        ])
+        worker.commit()
+
+    with SessionLocal() as db:
+        upsert_application(
+            db, backend.id, "Ann", "ann@x.com", "", 1.0, "", "new.pdf",
+            {backend.id: 80.0, frontend.id: 10.0}, [],
+        )
+        db.commit()
+
+    with SessionLocal() as db:
+        pcts = dict(db.query(JobMatch.job_id, JobMatch.match_pct))
+        cand = db.get(Candidate, cand_id)
+        assert pcts == {backend.id: 80.0, frontend.id: 10.0}
+        assert cand.resume_path == "new.pdf"
+
+
+def test_submit_application_saves_everything(jobs):
+    backend, _ = jobs
+    result = submit_application(
+        jobs, backend.id, "Ann", " Ann@X.com ", "", 2.0, "python, sql", b"not a pdf", "sid",
+    )
+
+    assert result["updated"] is False
+    assert result["match_pct"] == pytest.approx(200 / 3)
+    assert result["missing"] == ["docker"]
+    assert get_counters()["accepted"] == 1
+    with SessionLocal() as db:
+        cand = db.query(Candidate).one()
+        assert cand.email == "ann@x.com"
+        assert (UPLOAD_ROOT / cand.resume_path).exists()
+
+
+def test_failed_save_refunds_token_and_removes_upload(jobs, monkeypatch):
+    backend, _ = jobs
+    before = set(UPLOAD_ROOT.glob("*.pdf")) if UPLOAD_ROOT.exists() else set()
+
+    def boom(*args, **kwargs):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(applications, "upsert_application", boom)
+    with pytest.raises(RuntimeError):
+        submit_application(jobs, backend.id, "Ann", "ann@x.com", "", 0.0, "", b"x", "sid")
+
+    assert set(UPLOAD_ROOT.glob("*.pdf")) == before
+    assert get_counters()["accepted"] == 0
+    # full burst (3) still available for this applicant
+    for _ in range(3):
+        take_token(["email:ann@x.com", "session:sid"])
+    with pytest.raises(AdmissionRejected):
+        take_token(["email:ann@x.com"])
@@ -0,0 +1,28 @@
+# tests/test_db.py
+from sqlalchemy import text
+from sqlalchemy.orm import joinedload
+
+from lib.db import SessionLocal, Application, Candidate, Job, _has_column, engine, init_db
+
+
+def test_init_db_adds_new_columns_to_existing_tables():
+    # a database created before candidates.resume_path existed
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE candidates DROP COLUMN resume_path"))
+    engine.dispose()  # like a freshly started replica
+    with engine.connect() as conn:
+        assert not _has_column(conn, "candidates", "resume_path")
+
+    init_db()
+    init_db()  # idempotent
+
+    with engine.connect() as conn:
+        assert _has_column(conn, "candidates", "resume_path")
+    with SessionLocal() as db:
+        db.add(Job(title="t", description="d"))
+        db.add(Candidate(name="n", email="e@x.com"))
+        db.flush()
+        db.add(Application(job_id=1, candidate_id=1, resume_path="r.pdf"))
+        db.commit()
+        apps = db.query(Application).options(joinedload(Application.candidate)).all()
+        assert apps[0].candidate.resume_path is None
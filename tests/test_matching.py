@@ -0,0 +1,152 @@
+# tests/test_matching.py
+import pytest
+
+from lib import matching
+from lib.db import SessionLocal, Application, Candidate, Job, JobMatch, UnreadableResume
+from lib.matching import (
+    JobIndex, compute_match, get_job_index, recommend_candidates, refresh_match_matrix,
+    resume_words, save_matches,
+)
+
+JDS = {
+    1: "Senior Python engineer: python, sql, docker, kubernetes, aws. Python and SQL daily.",
+    2: "Frontend developer with React, TypeScript, CSS and HTML; react testing experience.",
+    3: "Data analyst: sql, excel, tableau, statistics, python. SQL reporting, excel models.",
+    4: "C++ / C# / Go / R developer",
+    5: "",
+}
+
+
+def test_job_index_agrees_with_compute_match():
+    index = JobIndex(JDS.items())
+    resume = "Python developer. SQL, Docker and some React. Excel reports."
+    skills = "kubernetes, c++; go"
+
+    res_words = resume_words(resume, skills)
+    scores = index.score(res_words)
+
+    assert set(scores) == set(JDS)
+    for job_id, jd in JDS.items():
+        pct, missing, _ = compute_match(resume, jd, skills)
+        assert scores[job_id] == pytest.approx(pct)
+        assert index.missing(job_id, res_words) == missing
+
+
+def test_job_index_scores_only_requested_jobs():
+    index = JobIndex(JDS.items())
+    assert set(index.score({"python"}, job_ids=[1, 3, 99])) == {1, 3}
+
+
+class FakeJob:
+    def __init__(self, id, description, created_at="2024-01-01"):
+        self.id, self.description, self.created_at = id, description, created_at
+
+
+def test_get_job_index_rebuilds_when_a_job_changes():
+    first = get_job_index([FakeJob(1, "python sql")])
+    assert get_job_index([FakeJob(1, "python sql")]) is first
+
+    # same id, different job (e.g. rowid reused after a delete)
+    second = get_job_index([FakeJob(1, "react css")])
+    assert second is not first
+    assert second.score({"react"})[1] > 0
+
+
+@pytest.fixture
+def matrix(monkeypatch):
+    """Two jobs, two candidates with (fake) resumes; extraction reads RESUMES."""
+    resumes = {"ann.pdf": "python sql docker", "bob.pdf": "react css html"}
+
+    def fake_extract(path):
+        name = path.rsplit("/", 1)[-1]
+        if name not in resumes:
+            raise FileNotFoundError(path)
+        return resumes[name]
+
+    monkeypatch.setattr(matching, "extract_pdf_text_from_file", fake_extract)
+    with SessionLocal() as db:
+        db.add_all([
+            Job(id=1, title="Backend", description="python sql docker"),
+            Job(id=2, title="Frontend", description="react css html"),
+            Candidate(id=1, name="Ann", email="ann@x.com", resume_path="ann.pdf"),
+            Candidate(id=2, name="Bob", email="bob@x.com", resume_path="bob.pdf"),
+        ])
+        db.commit()
+    return resumes
+
+
+def pcts():
+    with SessionLocal() as db:
+        return {(m.candidate_id, m.job_id): m.match_pct for m in db.query(JobMatch)}
+
+
+def test_incremental_refresh_fills_only_missing_pairs(matrix):
+    with SessionLocal() as db:
+        stats = refresh_match_matrix(db)
+    assert stats["pairs"] == 4
+    assert pcts()[(1, 1)] == 100.0 and pcts()[(1, 2)] == 0.0
+
+    # an existing score is left alone; only the new job gets scored
+    with SessionLocal() as db:
+        db.query(JobMatch).filter(JobMatch.candidate_id == 1, JobMatch.job_id == 1).update({"match_pct": 5.0})
+        db.add(Job(id=3, title="Fullstack", description="python react"))
+        db.commit()
+        stats = refresh_match_matrix(db)
+    assert stats == {"candidates": 2, "pairs": 2, "unreadable": 0, "backed_off": 0}
+    assert pcts()[(1, 1)] == 5.0
+    assert pcts()[(1, 3)] == 50.0 and pcts()[(2, 3)] == 50.0
+
+    with SessionLocal() as db:
+        assert refresh_match_matrix(db)["pairs"] == 0
+        # full rescoring replaces the stale value
+        assert refresh_match_matrix(db, full=True)["pairs"] == 6
+    assert pcts()[(1, 1)] == 100.0
+
+
+def test_full_refresh_keeps_scores_written_during_the_run(matrix, monkeypatch):
+    with SessionLocal() as db:
+        refresh_match_matrix(db)
+
+    real_extract = matching.extract_pdf_text_from_file
+
+    def extract_while_ann_reapplies(path):
+        if path.endswith("ann.pdf"):
+            # the apply flow saves scores from a newer resume mid-run
+            with SessionLocal() as other:
+                save_matches(other, 1, {1: 42.0, 2: 42.0})
+                other.commit()
+        return real_extract(path)
+
+    monkeypatch.setattr(matching, "extract_pdf_text_from_file", extract_while_ann_reapplies)
+    with SessionLocal() as db:
+        refresh_match_matrix(db, full=True)
+    assert pcts()[(1, 1)] == 42.0 and pcts()[(1, 2)] == 42.0
+
+
+def test_unreadable_resumes_back_off(matrix):
+    with SessionLocal() as db:
+        db.query(Candidate).filter(Candidate.id == 2).update({"resume_path": "gone.pdf"})
+        db.commit()
+
+        assert refresh_match_matrix(db)["unreadable"] == 1
+        stats = refresh_match_matrix(db)
+        assert stats["unreadable"] == 0 and stats["backed_off"] == 1
+        assert db.get(UnreadableResume, "gone.pdf").failures == 1
+
+        # a new upload is tried right away
+        matrix["new.pdf"] = "react"
+        db.query(Candidate).filter(Candidate.id == 2).update({"resume_path": "new.pdf"})
+        db.commit()
+        assert refresh_match_matrix(db)["candidates"] == 1
+
+
+def test_recommend_candidates_excludes_existing_applicants(matrix):
+    with SessionLocal() as db:
+        refresh_match_matrix(db)
+        db.add(Application(job_id=1, candidate_id=1, resume_path="ann.pdf"))
+        db.commit()
+
+        assert [c.id for c, _ in recommend_candidates(db, 1)] == [2]
+        recs = recommend_candidates(db, 2)
+        assert [(c.id, m.match_pct) for c, m in recs] == [(2, 100.0), (1, 0.0)]
+        assert [c.id for c, _ in recommend_candidates(db, 2, min_match=50)] == [2]
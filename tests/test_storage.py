@@ -0,0 +1,30 @@
+# tests/test_storage.py
+from pathlib import Path
+
+from lib.storage import UPLOAD_ROOT, delete_resume, resume_file, save_resume
+
+
+def test_save_resume_is_relative_to_upload_root():
+    stored = save_resume(b"%PDF-1.4 data", "Jane Doe")
+
+    assert not Path(stored).is_absolute()
+    assert stored.startswith("Jane_Doe_") and stored.endswith(".pdf")
+    assert resume_file(stored) == UPLOAD_ROOT / stored
+    assert resume_file(stored).read_bytes() == b"%PDF-1.4 data"
+    assert not list(UPLOAD_ROOT.glob(".*.part"))
+
+
+def test_delete_resume():
+    stored = save_resume(b"x", "someone")
+    delete_resume(stored)
+    assert not resume_file(stored).exists()
+    delete_resume(stored)  # already gone is fine
+
+
+def test_legacy_uploads_prefix_resolves_under_upload_root():
+    assert resume_file("uploads/old_1234.pdf") == UPLOAD_ROOT / "old_1234.pdf"
+
+
+def test_absolute_path_is_kept(tmp_path):
+    p = tmp_path / "r.pdf"
+    assert resume_file(str(p)) == p